@@ -1,15 +1,22 @@
 # app/main.py
 import os
+import re
+import asyncio
+import logging
 import uvicorn
 import sqlite3
 import time
-import json
-from datetime import datetime, timezone
-from typing import List, Optional
-
-import requests
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Set, Union
+
+import aiofiles
+import aiosqlite
+import httpx
+import msgpack
+from aiosqlitepool import SQLiteConnectionPool
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, Form, Request, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -21,44 +28,263 @@ CLOUDINARY_UPLOAD_URL = os.getenv("CLOUDINARY_UPLOAD_URL")  # e.g. https://api.c
 CLOUDINARY_UPLOAD_PRESET = os.getenv("CLOUDINARY_UPLOAD_PRESET")  # if using unsigned preset
 DB_PATH = os.getenv("SQLITE_PATH", "/data/telemetry.db")
 PHOTOS_DIR = os.getenv("PHOTOS_DIR", "/data/photos")
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
 PUBLIC_URL = os.getenv("PUBLIC_URL", "")  # e.g. https://your-app.up.railway.app
+BASE_URL = PUBLIC_URL.rstrip("/") or None  # None: derive from each request
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", (os.cpu_count() or 1) * 2))
+TELEMETRY_BATCH_SIZE = int(os.getenv("TELEMETRY_BATCH_SIZE", 500))  # max rows per INSERT transaction
+TELEMETRY_FLUSH_MS = int(os.getenv("TELEMETRY_FLUSH_MS", 100))  # max time a row waits for its batch
+TELEMETRY_QUEUE_SIZE = int(os.getenv("TELEMETRY_QUEUE_SIZE", 10000))  # rows buffered before POSTs get 503
+TELEMETRY_RETRY_MAX_S = 30.0  # cap on the backoff between retries of a locked/busy write
+
+TELEMETRY_BROADCAST_MS = int(os.getenv("TELEMETRY_BROADCAST_MS", 100))  # WS telemetry coalescing window
+UPLOAD_CHUNK_SIZE = 64 * 1024  # photo bytes copied to disk per read
+FILENAME_TRANSLATION = str.maketrans({" ": "_", "/": "_", "\\": "_"})  # sanitizes stored photo names
+BROADCAST_CHUNK_SIZE = 50  # sockets sent to per gather() before yielding to the loop
+MAX_WS_CLIENTS = int(os.getenv("MAX_WS_CLIENTS", 500))
+WS_SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", 1.0))  # seconds before a slow client is dropped
+
+logger = logging.getLogger(__name__)
 
 # Ensure directories exist
 os.makedirs(os.path.dirname(DB_PATH) or ".", exist_ok=True)
 os.makedirs(PHOTOS_DIR, exist_ok=True)
 
 # -----------------------
-# SQLite helper
+# SQLite helpers
 # -----------------------
-def get_db_conn():
-    # Using default sqlite3 connection; for production consider using a proper DB or an async DB driver.
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+# Per-connection tuning. journal_mode=WAL is persistent on the file, so it is
+# set once in init_db(); these have to be applied on every pooled connection.
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",  # safe with WAL, fsyncs only at checkpoints
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=134217728",  # 128 MiB
+    "PRAGMA cache_size=-20000",  # ~20 MB page cache
+    "PRAGMA busy_timeout=5000",
+)
+
+# Hot-path statements, kept as constants so every call passes the identical
+# string and hits the connection's prepared-statement cache.
+INSERT_TELEMETRY_SQL = "INSERT INTO telemetry(time, lat, lon, alt, batt, meta) VALUES (?,?,?,?,?,?)"
+SELECT_TELEMETRY_SQL = "SELECT time, lat, lon, alt, batt, meta FROM telemetry ORDER BY time DESC LIMIT ?"
+TELEMETRY_COLUMNS = ("time", "lat", "lon", "alt", "batt", "meta")  # column order of SELECT_TELEMETRY_SQL
+
+async def create_db_conn() -> aiosqlite.Connection:
+    # autocommit mode: single statements commit on their own, batches use explicit BEGIN
+    conn = await aiosqlite.connect(DB_PATH, isolation_level=None)
+    for pragma in CONNECTION_PRAGMAS:
+        await conn.execute(pragma)
     return conn
 
+# Long-lived connections shared by all requests; created in lifespan()
+pool: Optional[SQLiteConnectionPool] = None
+http_client: Optional[httpx.AsyncClient] = None
+
+# time is stored as integer microseconds since the Unix epoch (UTC)
+CREATE_TELEMETRY_SQL = """
+    CREATE TABLE IF NOT EXISTS telemetry(
+        id INTEGER PRIMARY KEY,
+        time INTEGER,
+        lat REAL,
+        lon REAL,
+        alt REAL,
+        batt REAL,
+        meta TEXT
+    )
+"""
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def now_us() -> int:
+    return time.time_ns() // 1000
+
+def is_sqlite_value(value) -> bool:
+    # what a telemetry column can bind: SQLite integers are signed 64-bit
+    if isinstance(value, int):
+        return -2**63 <= value < 2**63
+    if isinstance(value, str):
+        # lone surrogates (JSON "\ud800") can't be stored as UTF-8
+        try:
+            value.encode("utf-8")
+        except UnicodeEncodeError:
+            return False
+        return True
+    return value is None or isinstance(value, float)
+
+# Text that SQLite's REAL affinity converts to a number (no hex, inf, nan or "_")
+REAL_TEXT = re.compile(r"\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\s*", re.ASCII)
+
+def as_real(value):
+    # the value a REAL column stores, so queued/cached rows match what /recent reads back
+    if isinstance(value, (int, float)):
+        value = float(value)
+        return None if value != value else value  # SQLite stores NaN as NULL
+    if isinstance(value, str) and REAL_TEXT.fullmatch(value):
+        return float(value)
+    return value
+
+def iso_time(us: Optional[int]) -> Optional[str]:
+    # only done when rows are returned, never while sorting
+    if us is None:
+        return None
+    return (EPOCH + timedelta(microseconds=us)).isoformat()
+
+def parse_iso_us(text) -> Optional[int]:
+    # exact to the microsecond, unlike SQLite's millisecond julianday()
+    try:
+        dt = datetime.fromisoformat(text)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - EPOCH) // timedelta(microseconds=1)
+
+def migrate_text_time(cur):
+    # Older databases stored time as an ISO-8601 TEXT column; rewrite them once.
+    columns = {row[1]: row[2] for row in cur.execute("PRAGMA table_info(telemetry)")}
+    if columns.get("time", "").upper() != "TEXT":
+        return
+    cur.execute("BEGIN")
+    cur.execute("ALTER TABLE telemetry RENAME TO telemetry_text_time")
+    cur.execute(CREATE_TELEMETRY_SQL)
+    # unparseable times become NULL rather than dropping the row
+    old_rows = cur.connection.execute(
+        "SELECT time, lat, lon, alt, batt, meta FROM telemetry_text_time ORDER BY rowid"
+    )
+    cur.executemany(INSERT_TELEMETRY_SQL, ((parse_iso_us(r[0]), *r[1:]) for r in old_rows))
+    cur.execute("DROP TABLE telemetry_text_time")
+    cur.execute("COMMIT")
+
 def init_db():
-    conn = get_db_conn()
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
+    # auto_vacuum only takes effect if set before the first table is created
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    # WAL lets /api/telemetry/recent readers run while telemetry is being written
+    conn.execute("PRAGMA journal_mode=WAL")
     cur = conn.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS telemetry(
-            time TEXT,
-            lat REAL,
-            lon REAL,
-            alt REAL,
-            batt REAL,
-            meta TEXT
-        )
-        """
-    )
-    conn.commit()
+    migrate_text_time(cur)
+    cur.execute(CREATE_TELEMETRY_SQL)
+    # lets ORDER BY time DESC LIMIT ? walk the index and stop after LIMIT rows
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_telemetry_time ON telemetry(time DESC)")
+    cur.execute("ANALYZE")
     conn.close()
 
-init_db()
+# Rows accepted by /api/telemetry waiting to be written; None tells the flusher to stop.
+# Created in lifespan() so it belongs to the loop serving the app.
+telemetry_queue: "Optional[asyncio.Queue[Optional[tuple]]]" = None
+# Newest row written to SQLite, served by /api/telemetry/latest without a query
+latest_row: Optional[tuple] = None
+
+async def write_telemetry(batch: List[tuple]):
+    # one transaction (and one WAL sync) per batch instead of per row
+    async with pool.connection() as conn:
+        # IMMEDIATE takes the write lock up front instead of upgrading mid-transaction
+        await conn.execute("BEGIN IMMEDIATE")
+        try:
+            await conn.executemany(INSERT_TELEMETRY_SQL, batch)
+        except Exception:
+            await conn.rollback()
+            raise
+        await conn.commit()
+
+# Errors caused by the rows themselves; retrying the same rows can't succeed
+TELEMETRY_DATA_ERRORS = (
+    UnicodeEncodeError,
+    sqlite3.InterfaceError,
+    sqlite3.ProgrammingError,
+    sqlite3.DataError,
+    sqlite3.IntegrityError,
+)
+
+async def write_telemetry_retrying(batch: List[tuple]):
+    # OperationalError ("database is locked", busy_timeout expired, ...) is about
+    # the database, not the rows: keep retrying the same batch with backoff
+    delay = 0.5
+    while True:
+        try:
+            await write_telemetry(batch)
+            return
+        except sqlite3.OperationalError as e:
+            logger.warning("telemetry write of %d rows failed (%s), retrying in %.1fs", len(batch), e, delay)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, TELEMETRY_RETRY_MAX_S)
+
+async def telemetry_flusher():
+    """
+    Drain telemetry_queue into SQLite. A batch is written once it holds
+    TELEMETRY_BATCH_SIZE rows or its first row has waited TELEMETRY_FLUSH_MS.
+    """
+    global latest_row
+    loop = asyncio.get_running_loop()
+    running = True
+    while running:
+        row = await telemetry_queue.get()
+        batch = []
+        deadline = loop.time() + TELEMETRY_FLUSH_MS / 1000
+        while row is not None:
+            batch.append(row)
+            remaining = deadline - loop.time()
+            if len(batch) >= TELEMETRY_BATCH_SIZE or remaining <= 0:
+                break
+            try:
+                row = await asyncio.wait_for(telemetry_queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+        else:
+            running = False
+        if not batch:
+            continue
+        try:
+            await write_telemetry_retrying(batch)
+        except TELEMETRY_DATA_ERRORS:
+            logger.exception("failed to write %d telemetry rows, retrying one by one", len(batch))
+        except Exception:
+            logger.exception("dropping %d telemetry rows", len(batch))
+            continue
+        else:
+            latest_row = batch[-1]
+            continue
+        # keep one bad row from losing the rest of the batch
+        for row in batch:
+            try:
+                await write_telemetry_retrying([row])
+            except Exception:
+                logger.exception("dropping telemetry row %r", row)
+            else:
+                latest_row = row
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global pool, http_client, latest_row, telemetry_queue, telemetry_event
+    # schema setup runs once per process at startup rather than on import
+    init_db()
+    pool = SQLiteConnectionPool(create_db_conn, pool_size=DB_POOL_SIZE)
+    async with pool.connection() as conn:
+        async with conn.execute(SELECT_TELEMETRY_SQL, (1,)) as cur:
+            latest_row = await cur.fetchone()
+    # kept open so Cloudinary uploads reuse the TCP/TLS connection
+    http_client = httpx.AsyncClient(http2=True, timeout=30.0)
+    telemetry_queue = asyncio.Queue(maxsize=TELEMETRY_QUEUE_SIZE)
+    telemetry_event = asyncio.Event()
+    flusher = asyncio.create_task(telemetry_flusher())
+    broadcaster = asyncio.create_task(telemetry_broadcaster())
+    try:
+        yield
+    finally:
+        broadcaster.cancel()
+        # let the flusher write whatever is still queued before closing the pool
+        await telemetry_queue.put(None)
+        await flusher
+        await pool.close()
+        await http_client.aclose()
 
 # -----------------------
 # FastAPI app
 # -----------------------
-app = FastAPI(title="Drone Cloud (Railway)")
+# Note: recent FastAPI releases (e.g. 0.143, which the unpinned requirement
+# installs) deprecate ORJSONResponse and emit FastAPIDeprecationWarning on
+# first use; it still works. Revisit when upgrading past the deprecation.
+app = FastAPI(title="Drone Cloud (Railway)", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # CORS: in production set explicit origins instead of "*"
 app.add_middleware(
@@ -70,7 +296,7 @@ app.add_middleware(
 )
 
 # Mount static dashboard and photos
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 app.mount("/photos", StaticFiles(directory=PHOTOS_DIR), name="photos")
 
 # -----------------------
@@ -78,7 +304,9 @@ app.mount("/photos", StaticFiles(directory=PHOTOS_DIR), name="photos")
 # -----------------------
 class ConnectionManager:
     def __init__(self):
-        self.active: List[WebSocket] = []
+        self.active: Set[WebSocket] = set()
+        # handshakes in progress, counted against MAX_WS_CLIENTS
+        self.connecting = 0
 
     async def connect(self, websocket: WebSocket, token: Optional[str]):
         # Basic token check
@@ -86,13 +314,23 @@ class ConnectionManager:
             # close with custom code
             await websocket.close(code=4001)
             return False
-        await websocket.accept()
-        self.active.append(websocket)
+        if len(self.active) + self.connecting >= MAX_WS_CLIENTS:
+            # accept first: closing before accept is sent as an HTTP 403 and
+            # the client would never see 1013 (try again later)
+            await websocket.accept()
+            await websocket.close(code=1013)
+            return False
+        # reserve the slot before awaiting so concurrent handshakes can't overshoot
+        self.connecting += 1
+        try:
+            await websocket.accept()
+        finally:
+            self.connecting -= 1
+        self.active.add(websocket)
         return True
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active:
-            self.active.remove(websocket)
+        self.active.discard(websocket)
 
     async def send_personal(self, websocket: WebSocket, message: str):
         try:
@@ -100,18 +338,82 @@ class ConnectionManager:
         except Exception:
             self.disconnect(websocket)
 
-    async def broadcast(self, message: str, sender: Optional[WebSocket] = None):
-        # iterate over a copy to allow modifications while iterating
-        for conn in list(self.active):
-            if conn == sender:
-                continue
-            try:
-                await conn.send_text(message)
-            except Exception:
-                self.disconnect(conn)
+    async def _send(self, websocket: WebSocket, message: Union[str, bytes]):
+        # bytes go out as binary frames, str as text frames
+        send = websocket.send_bytes(message) if isinstance(message, bytes) else websocket.send_text(message)
+        # bounded so a client that stopped reading can't hold up the broadcast
+        # or let its unsent frames pile up in memory
+        await asyncio.wait_for(send, WS_SEND_TIMEOUT)
+
+    async def _drop(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.close(code=1011), WS_SEND_TIMEOUT)
+        except Exception:
+            pass
+
+    async def broadcast(self, message: Union[str, bytes], sender: Optional[WebSocket] = None):
+        # snapshot the targets so disconnects during the sends don't affect iteration
+        targets = [conn for conn in self.active if conn is not sender]
+        for i in range(0, len(targets), BROADCAST_CHUNK_SIZE):
+            if i:
+                # let other tasks run between chunks when there are many clients
+                await asyncio.sleep(0)
+            chunk = targets[i:i + BROADCAST_CHUNK_SIZE]
+            # send concurrently so one slow client doesn't delay the rest
+            results = await asyncio.gather(
+                *(self._send(conn, message) for conn in chunk), return_exceptions=True
+            )
+            too_slow = []
+            for conn, result in zip(chunk, results):
+                if isinstance(result, Exception):
+                    self.disconnect(conn)
+                    if isinstance(result, asyncio.TimeoutError):
+                        too_slow.append(conn)
+            if too_slow:
+                await asyncio.gather(*(self._drop(conn) for conn in too_slow))
 
 manager = ConnectionManager()
 
+# Telemetry rows received since the last WS broadcast. Swapped out without
+# an await in between, so no lock is needed on the single event loop.
+pending_telemetry: List[tuple] = []
+# Set when pending_telemetry gets a row, so the broadcaster sleeps while idle.
+# Created in lifespan() alongside telemetry_queue.
+telemetry_event: Optional[asyncio.Event] = None
+
+def packable(row: tuple) -> bool:
+    try:
+        msgpack.packb(row)
+    except Exception:
+        logger.warning("leaving telemetry row %r out of the broadcast", row)
+        return False
+    return True
+
+async def telemetry_broadcaster():
+    """
+    Once telemetry arrives, wait TELEMETRY_BROADCAST_MS and send everything
+    in pending_telemetry to the UI clients as one MessagePack-encoded binary
+    message {"type": "telemetry_batch", "rows": [[time_us, lat, lon, alt, batt, meta], ...]}
+    instead of one WS frame per telemetry POST.
+    """
+    global pending_telemetry
+    while True:
+        await telemetry_event.wait()
+        # rows arriving during this window go out in the same message
+        await asyncio.sleep(TELEMETRY_BROADCAST_MS / 1000)
+        telemetry_event.clear()
+        batch, pending_telemetry = pending_telemetry, []
+        try:
+            message = msgpack.packb({"type": "telemetry_batch", "rows": batch})
+        except Exception:
+            # leave out only the rows that can't be packed, not the whole batch
+            logger.exception("failed to pack %d telemetry rows, packing one by one", len(batch))
+            message = msgpack.packb({"type": "telemetry_batch", "rows": [row for row in batch if packable(row)]})
+        try:
+            await manager.broadcast(message)
+        except Exception:
+            logger.exception("telemetry broadcast failed")
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket, token: str = ""):
     ok = await manager.connect(websocket, token)
@@ -136,72 +438,56 @@ async def telemetry(payload: dict):
     """
     Expected JSON body:
     {"lat":11.11, "lon":75.75, "alt":10, "batt":88, "meta":"optional text or json string"}
+
+    Each field must be a string, number or null (send structured meta as a
+    JSON string). The row is queued and written by telemetry_flusher(), so
+    "ok" means accepted, not yet durable.
     """
+    fields = []
+    for key in TELEMETRY_COLUMNS[1:]:
+        value = payload.get(key)
+        if not is_sqlite_value(value):
+            return ORJSONResponse({"status": "error", "detail": f"invalid {key}: expected string, number or null"}, status_code=400)
+        fields.append(value)
+    lat, lon, alt, batt, meta = fields
+    # same row for the queue, the WS batch and latest_row: what SQLite will store
+    row = (now_us(), as_real(lat), as_real(lon), as_real(alt), as_real(batt), meta)
     try:
-        conn = get_db_conn()
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO telemetry VALUES (?,?,?,?,?,?)",
-            (
-                datetime.now(timezone.utc).isoformat(),
-                payload.get("lat"),
-                payload.get("lon"),
-                payload.get("alt"),
-                payload.get("batt"),
-                payload.get("meta"),
-            ),
-        )
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        return JSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+        telemetry_queue.put_nowait(row)
+    except asyncio.QueueFull:
+        return ORJSONResponse({"status": "error", "detail": "telemetry backlog full, retry later"}, status_code=503)
 
-    # broadcast telemetry via WS to UI clients (non-blocking best-effort)
-    try:
-        await manager.broadcast(json.dumps({"type": "telemetry", "data": payload}))
-    except Exception:
-        pass
+    # picked up by telemetry_broadcaster() and sent to UI clients in the next batch
+    pending_telemetry.append(row)
+    telemetry_event.set()
 
     return {"status": "ok"}
 
 @app.get("/api/telemetry/recent")
-def telemetry_recent(limit: int = Query(50, ge=1, le=1000)):
+async def telemetry_recent(limit: int = Query(50, ge=1, le=1000)):
     """
     Return recent telemetry rows, newest first.
     Query param: limit (default 50, max 1000)
-    Returns: {rows: [{time, lat, lon, alt, batt, meta}, ...]}
+    Returns: {cols: [time, lat, lon, alt, batt, meta], rows: [[...], ...]}
     """
     try:
-        conn = get_db_conn()
-        cur = conn.cursor()
-        rows = cur.execute(
-            "SELECT time, lat, lon, alt, batt, meta FROM telemetry ORDER BY time DESC LIMIT ?",
-            (limit,)
-        ).fetchall()
-        conn.close()
+        async with pool.connection() as conn:
+            rows = await conn.execute_fetchall(SELECT_TELEMETRY_SQL, (limit,))
     except Exception as e:
-        return JSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+        return ORJSONResponse({"status": "error", "detail": str(e)}, status_code=500)
 
-    out = [
-        {"time": r[0], "lat": r[1], "lon": r[2], "alt": r[3], "batt": r[4], "meta": r[5]}
-        for r in rows
-    ]
-    return {"rows": out}
+    # positional rows, returned as a response directly so FastAPI skips jsonable_encoder
+    out = [(iso_time(r[0]), *r[1:]) for r in rows]
+    return ORJSONResponse({"cols": TELEMETRY_COLUMNS, "rows": out})
 
 
 @app.get("/api/telemetry/latest")
-def latest():
-    try:
-        conn = get_db_conn()
-        cur = conn.cursor()
-        row = cur.execute("SELECT * FROM telemetry ORDER BY time DESC LIMIT 1").fetchone()
-        conn.close()
-    except Exception as e:
-        return JSONResponse({"status": "error", "detail": str(e)}, status_code=500)
-
+async def latest():
+    # kept current by telemetry_flusher(); no DB round-trip per poll
+    row = latest_row
     if not row:
         return {}
-    return {"time": row[0], "lat": row[1], "lon": row[2], "alt": row[3], "batt": row[4], "meta": row[5]}
+    return {"time": iso_time(row[0]), "lat": row[1], "lon": row[2], "alt": row[3], "batt": row[4], "meta": row[5]}
 
 # -----------------------
 # Photo upload (Cloudinary optional or local file store)
@@ -216,22 +502,21 @@ async def upload_photo(request: Request, file: UploadFile = File(...), token: st
     Response: {"status":"ok","url": "<public url to /photos/...>"}
     """
     if token != AUTH_TOKEN:
-        return JSONResponse({"status": "forbidden"}, status_code=403)
-
-    contents = await file.read()
+        return ORJSONResponse({"status": "forbidden"}, status_code=403)
 
     # If Cloudinary configured, upload there
     if CLOUDINARY_UPLOAD_URL and CLOUDINARY_UPLOAD_PRESET:
-        files = {'file': (file.filename, contents)}
+        # pass the spooled upload file itself so it is streamed, not read into memory
+        files = {'file': (file.filename, file.file, file.content_type or 'image/jpeg')}
         data = {'upload_preset': CLOUDINARY_UPLOAD_PRESET}
         if meta:
             data['context'] = meta
         try:
-            r = requests.post(CLOUDINARY_UPLOAD_URL, files=files, data=data, timeout=30)
+            r = await http_client.post(CLOUDINARY_UPLOAD_URL, files=files, data=data)
         except Exception as e:
-            return JSONResponse({"status": "error", "detail": f"Cloud upload failed: {e}"}, status_code=500)
+            return ORJSONResponse({"status": "error", "detail": f"Cloud upload failed: {e}"}, status_code=500)
         if r.status_code not in (200, 201):
-            return JSONResponse({"status": "error", "detail": r.text}, status_code=500)
+            return ORJSONResponse({"status": "error", "detail": r.text}, status_code=500)
         resp = r.json()
         url = resp.get("secure_url") or resp.get("url")
         # Broadcast photo url to connected clients via WS
@@ -243,20 +528,18 @@ async def upload_photo(request: Request, file: UploadFile = File(...), token: st
 
     # Otherwise store file locally and return accessible URL
     ts = int(time.time() * 1000)
-    safe_name = f"photo_{ts}_{file.filename}".replace(" ", "_")
+    safe_name = f"photo_{ts}_{file.filename}".translate(FILENAME_TRANSLATION)
     path = os.path.join(PHOTOS_DIR, safe_name)
     try:
-        with open(path, "wb") as f:
-            f.write(contents)
+        async with aiofiles.open(path, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await f.write(chunk)
     except Exception as e:
-        return JSONResponse({"status": "error", "detail": f"write failed: {e}"}, status_code=500)
+        return ORJSONResponse({"status": "error", "detail": f"write failed: {e}"}, status_code=500)
 
     # Build accessible URL. Prefer PUBLIC_URL env var if set, else use request.base_url
-    if PUBLIC_URL:
-        base = PUBLIC_URL.rstrip("/")
-    else:
-        # request.base_url includes trailing slash, convert to scheme+host (ends with '/')
-        base = str(request.base_url).rstrip("/")
+    # (which includes a trailing slash)
+    base = BASE_URL or str(request.base_url).rstrip("/")
 
     photo_url = f"{base}/photos/{safe_name}"
 
@@ -286,6 +569,10 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=int(os.getenv("PORT", 8000)),
         reload=True,
+        loop="uvloop",
+        http="httptools",
+        ws="websockets",
+        ws_per_message_deflate=True,  # compress WS frames; telemetry/JSON compresses well
         proxy_headers=True,
         forwarded_allow_ips="*"
     )
@@ -0,0 +1,60 @@
+// Minimal MessagePack decoder for the dashboard's telemetry frames.
+// Served from /static so the live view doesn't depend on a CDN.
+// Exposes MessagePack.decode(Uint8Array); ext types are not supported.
+(function(global){
+  const utf8 = new TextDecoder();
+
+  function decode(bytes){
+    const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    let pos = 0;
+
+    function str(n){ const s = utf8.decode(bytes.subarray(pos, pos + n)); pos += n; return s; }
+    function bin(n){ const b = bytes.slice(pos, pos + n); pos += n; return b; }
+    function arr(n){ const a = new Array(n); for (let i = 0; i < n; i++) a[i] = next(); return a; }
+    function map(n){ const m = {}; for (let i = 0; i < n; i++){ const k = next(); m[k] = next(); } return m; }
+    function u8(){ return view.getUint8(pos++); }
+    function u16(){ const v = view.getUint16(pos); pos += 2; return v; }
+    function u32(){ const v = view.getUint32(pos); pos += 4; return v; }
+
+    function next(){
+      const b = u8();
+      if (b <= 0x7f) return b;                        // positive fixint
+      if (b >= 0xe0) return b - 0x100;                // negative fixint
+      if (b >= 0xa0 && b <= 0xbf) return str(b & 0x1f);
+      if (b >= 0x90 && b <= 0x9f) return arr(b & 0x0f);
+      if (b >= 0x80 && b <= 0x8f) return map(b & 0x0f);
+      let v;
+      switch (b){
+        case 0xc0: return null;
+        case 0xc2: return false;
+        case 0xc3: return true;
+        case 0xc4: return bin(u8());
+        case 0xc5: return bin(u16());
+        case 0xc6: return bin(u32());
+        case 0xca: v = view.getFloat32(pos); pos += 4; return v;
+        case 0xcb: v = view.getFloat64(pos); pos += 8; return v;
+        case 0xcc: return u8();
+        case 0xcd: return u16();
+        case 0xce: return u32();
+        // 64-bit ints (e.g. time_us) fit a double's 53-bit mantissa
+        case 0xcf: v = Number(view.getBigUint64(pos)); pos += 8; return v;
+        case 0xd0: v = view.getInt8(pos); pos += 1; return v;
+        case 0xd1: v = view.getInt16(pos); pos += 2; return v;
+        case 0xd2: v = view.getInt32(pos); pos += 4; return v;
+        case 0xd3: v = Number(view.getBigInt64(pos)); pos += 8; return v;
+        case 0xd9: return str(u8());
+        case 0xda: return str(u16());
+        case 0xdb: return str(u32());
+        case 0xdc: return arr(u16());
+        case 0xdd: return arr(u32());
+        case 0xde: return map(u16());
+        case 0xdf: return map(u32());
+      }
+      throw new Error('msgpack: unsupported type 0x' + b.toString(16));
+    }
+
+    return next();
+  }
+
+  global.MessagePack = { decode };
+})(window);